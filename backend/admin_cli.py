@@ -0,0 +1,241 @@
+"""
+Veritabanı inceleme / dışa aktarma aracı (view_db.py ve check_db.py yerine)
+
+Kullanım:
+  python admin_cli.py tables [--exact]
+      models.py'deki her tablo için satır sayısı, boyut, index'ler ve
+      index'i olmayan foreign key kolonları
+  python admin_cli.py export <tablo> [--format ndjson|csv] [--columns a,b]
+                             [--where kolon=deger ...] [--limit N] [--output dosya]
+      Tabloyu server-side cursor ile (yield_per) akıtarak yazar; bellek
+      kullanımı tablo boyutundan bağımsızdır.
+      --where operatörleri: =  !=  >=  <=  >  <  ~ (LIKE)
+
+password_hash gibi gizli kolonlar --include-secrets verilmedikçe yazılmaz.
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import func, inspect, select, text
+
+import models  # noqa: F401  (tüm modeller Base'e kaydolsun)
+from database import Base, engine
+
+SECRET_COLUMNS = {"password_hash"}
+_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+_WHERE_RE = re.compile(r"^(\w+)\s*(!=|>=|<=|=|>|<|~)\s*(.*)$")
+
+
+def _tables():
+    return {t.name.lower(): t for t in Base.metadata.sorted_tables}
+
+
+def _find_table(name: str):
+    table = _tables().get(name.lower())
+    if table is None:
+        raise SystemExit(f"Bilinmeyen tablo: {name}. Mevcut: {', '.join(sorted(_tables()))}")
+    return table
+
+
+# -------------------------
+# tables
+# -------------------------
+
+def _row_count(conn, table, exact: bool):
+    if not exact and engine.dialect.name == "postgresql":
+        # Büyük tabloda count(*) yerine istatistik tahmini
+        estimate = conn.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+            {"t": f'"{table.name}"'},
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return f"~{estimate}"
+    return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def _table_size(conn, table):
+    try:
+        if engine.dialect.name == "postgresql":
+            return conn.execute(
+                text("SELECT pg_total_relation_size(to_regclass(:t))"),
+                {"t": f'"{table.name}"'},
+            ).scalar()
+        if engine.dialect.name == "sqlite":
+            # dbstat derlenmemiş olabilir; o zaman boyut bilinmiyor
+            return conn.execute(
+                text(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = :t "
+                    "OR name IN (SELECT name FROM sqlite_master WHERE tbl_name = :t)"
+                ),
+                {"t": table.name},
+            ).scalar()
+    except Exception:
+        conn.rollback()
+    return None
+
+
+def _human(size):
+    if size is None:
+        return "?"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def cmd_tables(args):
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+
+    with engine.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            print("=" * 50)
+            print(f"{table.name}")
+            print("=" * 50)
+            if table.name not in existing:
+                print("  (veritabanında yok)\n")
+                continue
+
+            print(f"  Satır: {_row_count(conn, table, args.exact)}")
+            print(f"  Boyut: {_human(_table_size(conn, table))}")
+
+            pk = inspector.get_pk_constraint(table.name).get("constrained_columns") or []
+            indexes = inspector.get_indexes(table.name)
+            print(f"  PK: {', '.join(pk) or '-'}")
+            for ix in indexes:
+                unique = " (unique)" if ix.get("unique") else ""
+                print(f"  Index: {ix['name']} -> {', '.join(c for c in ix['column_names'] if c)}{unique}")
+
+            # Bir FK kolonu herhangi bir index'in (PK dahil) ilk kolonu değilse kapsanmıyor
+            leading = {cols[0] for cols in [pk] + [ix["column_names"] for ix in indexes] if cols}
+            for fk in inspector.get_foreign_keys(table.name):
+                col = fk["constrained_columns"][0]
+                if col not in leading:
+                    print(f"  ⚠️  Index'siz foreign key: {col} -> {fk['referred_table']}")
+            print()
+
+
+# -------------------------
+# export
+# -------------------------
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
+
+
+def _where_clause(table, expr: str):
+    match = _WHERE_RE.match(expr)
+    if not match:
+        raise SystemExit(f"Geçersiz --where: {expr!r} (ör. user_id=5, price<=100, name~%kebap%)")
+    name, op, raw = match.groups()
+    if name not in table.c:
+        raise SystemExit(f"{table.name} tablosunda {name} kolonu yok")
+    col = table.c[name]
+    value = raw
+    if op != "~":
+        try:
+            python_type = col.type.python_type
+        except NotImplementedError:
+            python_type = str
+        if python_type is bool:
+            # bool("false") True olurdu
+            if raw.lower() not in _BOOLEANS:
+                raise SystemExit(f"{name} için true/false/1/0 bekleniyor: {raw!r}")
+            value = _BOOLEANS[raw.lower()]
+        elif python_type is not str:
+            try:
+                value = python_type(raw)
+            except (ValueError, TypeError, ArithmeticError):
+                raise SystemExit(f"{name} için geçersiz değer: {raw!r}")
+    return {
+        "=": lambda: col == value,
+        "!=": lambda: col != value,
+        ">=": lambda: col >= value,
+        "<=": lambda: col <= value,
+        ">": lambda: col > value,
+        "<": lambda: col < value,
+        "~": lambda: col.like(value),
+    }[op]()
+
+
+def cmd_export(args):
+    table = _find_table(args.table)
+
+    if args.columns:
+        names = [c.strip() for c in args.columns.split(",") if c.strip()]
+        missing = [n for n in names if n not in table.c]
+        if missing:
+            raise SystemExit(f"{table.name} tablosunda olmayan kolon(lar): {', '.join(missing)}")
+    else:
+        names = [c.name for c in table.c]
+    if not args.include_secrets:
+        names = [n for n in names if n not in SECRET_COLUMNS]
+
+    stmt = select(*[table.c[n] for n in names])
+    for expr in args.where or []:
+        stmt = stmt.where(_where_clause(table, expr))
+    pk = list(table.primary_key.columns)
+    if pk:
+        stmt = stmt.order_by(*pk)
+    if args.limit:
+        stmt = stmt.limit(args.limit)
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        writer = None
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(names)
+
+        with engine.connect() as conn:
+            result = conn.execution_options(yield_per=args.batch).execute(stmt)
+            for row in result:
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False))
+                    out.write("\n")
+                count += 1
+    finally:
+        if args.output:
+            out.close()
+
+    print(f"✅ {table.name}: {count} satır yazıldı", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Meal app veritabanı admin aracı")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_tables = sub.add_parser("tables", help="Tablo istatistikleri ve index kapsamı")
+    p_tables.add_argument("--exact", action="store_true", help="Postgres'te de count(*) kullan")
+    p_tables.set_defaults(func=cmd_tables)
+
+    p_export = sub.add_parser("export", help="Tabloyu NDJSON/CSV olarak akıt")
+    p_export.add_argument("table")
+    p_export.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    p_export.add_argument("--columns", help="virgülle ayrılmış kolonlar")
+    p_export.add_argument("--where", action="append", help="kolon<op>deger, tekrar edilebilir")
+    p_export.add_argument("--limit", type=int)
+    p_export.add_argument("--batch", type=int, default=1000, help="yield_per boyutu")
+    p_export.add_argument("--output", "-o", help="dosya (yoksa stdout)")
+    p_export.add_argument("--include-secrets", action="store_true")
+    p_export.set_defaults(func=cmd_export)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
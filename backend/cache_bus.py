@@ -0,0 +1,265 @@
+# backend/cache_bus.py
+"""
+Çok worker'lı (uvicorn --workers N) kurulumlar için cache invalidation bus.
+
+Write endpoint'leri commit sonrası bir değişiklik olayı yayınlar:
+    cache_bus.publish("menu_item", food_id)
+Her worker olayları dinler ve kendi process içi cache'lerini günceller.
+Olayı yayınlayan worker kendi cache'ini zaten doğrudan güncellediği için
+kendi olaylarını atlar (origin).
+
+Transport'lar (CACHE_BUS_TRANSPORT):
+- local  : sadece bu process (tek worker)
+- table  : cache_event tablosu + polling (SQLite varsayılanı)
+- notify : Postgres LISTEN/NOTIFY, psycopg2 ile (Postgres varsayılanı)
+
+Bağlantı kopup geri gelince kaçırılan olaylar bilinemeyeceği için
+handler'lara kind="*" (tam resync) olayı gider.
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import delete, func, insert, select as sa_select, text
+
+from models import CacheEvent
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = float(os.getenv("CACHE_BUS_POLL_INTERVAL", "0.5"))
+EVENT_RETENTION_SECONDS = float(os.getenv("CACHE_BUS_RETENTION_SECONDS", "3600"))
+NOTIFY_CHANNEL = "cache_events"
+
+RESYNC = "*"
+
+
+class ChangeEvent(NamedTuple):
+    kind: str  # "menu_item" | "restaurant" | "user_profile" | "*"
+    key: Optional[int]
+    version: int
+    origin: str
+
+
+# -------------------------
+# Transports
+# -------------------------
+
+class LocalTransport:
+    """Process dışına bir şey göndermez; tek worker için."""
+
+    def publish(self, kind, key, origin) -> int:
+        return time.time_ns()
+
+    def start(self, deliver: Callable):
+        pass
+
+    def stop(self):
+        pass
+
+
+class _ThreadedTransport(ABC):
+    """Dinleme döngüsünü (_run) ayrı bir thread'de çalıştıran transport'lar"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._stop = threading.Event()
+        self._thread = None
+        self._deliver = None
+
+    def start(self, deliver: Callable):
+        self._deliver = deliver
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"{type(self).__name__}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @abstractmethod
+    def _run(self):
+        """self._stop set edilene kadar olayları self._deliver'a iletir"""
+
+    @abstractmethod
+    def publish(self, kind, key, origin) -> int:
+        ...
+
+
+class TableTransport(_ThreadedTransport):
+    """Olaylar cache_event tablosuna yazılır; event_id aynı zamanda versiyondur."""
+
+    def __init__(self, engine, poll_interval: float = POLL_INTERVAL):
+        super().__init__(engine)
+        self.poll_interval = poll_interval
+        self._last_id = None
+
+    def _max_event_id(self, conn) -> int:
+        return conn.execute(
+            sa_select(func.coalesce(func.max(CacheEvent.event_id), 0))
+        ).scalar()
+
+    def start(self, deliver: Callable):
+        CacheEvent.__table__.create(self.engine, checkfirst=True)
+        # Sadece açılıştan sonraki olaylar ilgilendiriyor
+        with self.engine.connect() as conn:
+            self._last_id = self._max_event_id(conn)
+        super().start(deliver)
+
+    def publish(self, kind, key, origin) -> int:
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                insert(CacheEvent).values(
+                    kind=kind, key=key, origin=origin, created_at=time.time()
+                )
+            )
+            return result.inserted_primary_key[0]
+
+    def _run(self):
+        last_id = self._last_id
+        last_prune = 0.0
+        while not self._stop.wait(self.poll_interval):
+            try:
+                with self.engine.begin() as conn:
+                    if last_id is None:
+                        # Bağlantı hatası sonrası: resync gönderildi, buradan devam
+                        last_id = self._max_event_id(conn)
+                        continue
+                    rows = conn.execute(
+                        sa_select(CacheEvent)
+                        .where(CacheEvent.event_id > last_id)
+                        .order_by(CacheEvent.event_id)
+                        .limit(500)
+                    ).all()
+                    if time.time() - last_prune > EVENT_RETENTION_SECONDS / 10:
+                        # En yeni satır hiç silinmez: AUTOINCREMENT'sız eski
+                        # tablolarda da id'ler geriye gitmesin
+                        newest = sa_select(func.max(CacheEvent.event_id)).scalar_subquery()
+                        conn.execute(
+                            delete(CacheEvent).where(
+                                CacheEvent.created_at < time.time() - EVENT_RETENTION_SECONDS,
+                                CacheEvent.event_id < newest,
+                            )
+                        )
+                        last_prune = time.time()
+                for row in rows:
+                    last_id = row.event_id
+                    self._deliver(ChangeEvent(row.kind, row.key, row.event_id, row.origin))
+            except Exception:
+                logger.exception("cache_event polling hatası")
+                if last_id is not None:
+                    last_id = None  # yeniden başlarken aradakileri bilemeyiz
+                    self._deliver(ChangeEvent(RESYNC, None, time.time_ns(), ""))
+
+
+class PostgresNotifyTransport(_ThreadedTransport):
+    """pg_notify ile yayın, ayrı bir (pool dışı) bağlantıda LISTEN."""
+
+    def __init__(self, engine, channel: str = NOTIFY_CHANNEL):
+        super().__init__(engine)
+        self.channel = channel
+
+    def publish(self, kind, key, origin) -> int:
+        version = time.time_ns()
+        payload = json.dumps({"k": kind, "id": key, "v": version, "o": origin})
+        with self.engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:ch, :p)"), {"ch": self.channel, "p": payload})
+        return version
+
+    def _run(self):
+        first = True
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                raw.detach()  # LISTEN durumu pool'a geri dönmesin
+                conn = raw.driver_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.channel}")
+                if not first:
+                    self._deliver(ChangeEvent(RESYNC, None, time.time_ns(), ""))
+                first = False
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        data = json.loads(note.payload)
+                        self._deliver(ChangeEvent(data["k"], data["id"], data["v"], data["o"]))
+            except Exception:
+                logger.exception("LISTEN bağlantısı koptu, yeniden bağlanılıyor")
+                self._stop.wait(1.0)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+
+# -------------------------
+# Bus
+# -------------------------
+
+class CacheBus:
+    def __init__(self, transport):
+        self.transport = transport
+        self.origin = uuid.uuid4().hex
+        self._handlers: list[Callable] = []
+        self._versions: dict = {}  # (kind, key) -> son uygulanan versiyon
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Callable[[ChangeEvent], None]):
+        self._handlers.append(handler)
+
+    def publish(self, kind: str, key: Optional[int] = None):
+        """Commit SONRASI çağrılmalı; hata olursa isteği düşürmez, sadece loglar."""
+        try:
+            version = self.transport.publish(kind, key, self.origin)
+        except Exception:
+            logger.exception("cache olayı yayınlanamadı: %s %s", kind, key)
+            return
+        with self._lock:
+            self._versions[(kind, key)] = version
+
+    def _deliver(self, event: ChangeEvent):
+        if event.origin == self.origin:
+            return
+        if event.kind != RESYNC:
+            with self._lock:
+                if event.version <= self._versions.get((event.kind, event.key), -1):
+                    return  # eski / tekrar eden olay
+                self._versions[(event.kind, event.key)] = event.version
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("cache handler hatası: %s", event)
+
+    def start(self):
+        self.transport.start(self._deliver)
+
+    def stop(self):
+        self.transport.stop()
+
+
+def make_transport(engine):
+    name = os.getenv("CACHE_BUS_TRANSPORT")
+    if not name:
+        name = "notify" if engine.dialect.name == "postgresql" else "table"
+    if name == "local":
+        return LocalTransport()
+    if name == "table":
+        return TableTransport(engine)
+    if name == "notify":
+        return PostgresNotifyTransport(engine)
+    raise RuntimeError(f"Bilinmeyen CACHE_BUS_TRANSPORT: {name}")
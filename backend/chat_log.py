@@ -0,0 +1,139 @@
+# backend/chat_log.py
+"""
+/chat için write-behind log: istek yolunda sadece bellekteki tampona eklenir,
+arka plandaki thread boyut ya da süre dolunca çok satırlı INSERT ile yazar.
+
+- Tampon sınırlı (CHAT_LOG_BUFFER); doluysa YENİ kayıt atılır ve sayılır
+- Kapanışta (lifespan) kalan her şey flush edilir
+- Seçilen yemek (chosen_food_id) istek yolunda değil flush sırasında çözülür
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import insert
+
+from models import ChatLog
+
+logger = logging.getLogger(__name__)
+
+CHAT_LOG_ENABLED = os.getenv("CHAT_LOG_ENABLED", "1") == "1"
+CHAT_LOG_BUFFER = int(os.getenv("CHAT_LOG_BUFFER", "10000"))
+CHAT_LOG_BATCH = int(os.getenv("CHAT_LOG_BATCH", "500"))
+CHAT_LOG_FLUSH_SECONDS = float(os.getenv("CHAT_LOG_FLUSH_SECONDS", "2"))
+
+# Tek INSERT ... VALUES içindeki satır sayısı (SQLite değişken limiti için)
+ROWS_PER_STATEMENT = 100
+
+
+class ChatLogWriter:
+    def __init__(
+        self,
+        engine,
+        resolve_dishes: Optional[Callable[[list[str]], list[Optional[int]]]] = None,
+        max_buffer: int = CHAT_LOG_BUFFER,
+        batch_size: int = CHAT_LOG_BATCH,
+        flush_interval: float = CHAT_LOG_FLUSH_SECONDS,
+    ):
+        self.engine = engine
+        self.resolve_dishes = resolve_dishes
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(
+        self,
+        user_id: int,
+        message: str,
+        reply: str,
+        profile_ms: float,
+        menu_ms: float,
+        llm_ms: float,
+        total_ms: float,
+        cache_hit: bool,
+    ):
+        """İstek yolunda çağrılır; DB'ye dokunmaz."""
+        if not CHAT_LOG_ENABLED:
+            return
+        row = {
+            "user_id": user_id,
+            "message": message,
+            "reply": reply,
+            "profile_ms": profile_ms,
+            "menu_ms": menu_ms,
+            "llm_ms": llm_ms,
+            "total_ms": total_ms,
+            "cache_hit": cache_hit,
+            "created_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                return
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    # -------------------------
+    # Arka plan
+    # -------------------------
+
+    def start(self):
+        if not CHAT_LOG_ENABLED:
+            return
+        ChatLog.__table__.create(self.engine, checkfirst=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ChatLogWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()  # thread'in kaçırdığı son kayıtlar
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+
+        # Seçilen yemekler batch başına tek çağrıyla çözülür
+        chosen = None
+        if self.resolve_dishes:
+            try:
+                chosen = self.resolve_dishes([row["reply"] for row in rows])
+            except Exception:
+                logger.exception("chat log: seçilen yemekler çözülemedi")
+        for i, row in enumerate(rows):
+            row["chosen_food_id"] = chosen[i] if chosen else None
+
+        try:
+            with self.engine.begin() as conn:
+                for i in range(0, len(rows), ROWS_PER_STATEMENT):
+                    conn.execute(insert(ChatLog).values(rows[i:i + ROWS_PER_STATEMENT]))
+        except Exception:
+            # Analitik veri: isteği hiç etkilemesin, batch düşer
+            logger.exception("chat log flush başarısız, %d kayıt atıldı", len(rows))
+            self.dropped += len(rows)
+            return 0
+        return len(rows)
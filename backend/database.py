@@ -1,8 +1,13 @@
+import itertools
 import os
+import threading
+import time
 from pathlib import Path
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 load_dotenv(dotenv_path=Path(__file__).parent / ".env")
@@ -11,15 +16,116 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL bulunamadı. backend/.env dosyasını kontrol et.")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False,
-)
+# Virgülle ayrılmış read-replica URL'leri (boşsa tüm okumalar primary'ye gider)
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+# Bir kullanıcı yazdıktan sonra bu kadar saniye okumaları primary'den yapılır
+REPLICA_LAG_SECONDS = float(os.getenv("REPLICA_LAG_SECONDS", "5"))
+
+
+def _make_engine(url: str, prefix: str):
+    """
+    Pool ayarları engine başına env'den okunur:
+      {prefix}_POOL_SIZE, {prefix}_MAX_OVERFLOW, {prefix}_POOL_TIMEOUT
+    (prefix: DB = primary, DB_REPLICA = replica'lar)
+    """
+    kwargs = {"pool_pre_ping": True, "echo": False}
+    if not url.startswith("sqlite"):
+        for env_key, arg, cast in (
+            ("POOL_SIZE", "pool_size", int),
+            ("MAX_OVERFLOW", "max_overflow", int),
+            ("POOL_TIMEOUT", "pool_timeout", float),
+        ):
+            value = os.getenv(f"{prefix}_{env_key}")
+            if value:
+                kwargs[arg] = cast(value)
+    return create_engine(url, **kwargs)
+
+
+engine = _make_engine(DATABASE_URL, "DB")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+# -------------------------
+# Read replica routing
+# -------------------------
+
+class _Replica:
+    def __init__(self, url: str):
+        self.engine = _make_engine(url, "DB_REPLICA")
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.checked_at = 0.0
+        self._check_lock = threading.Lock()
+
+    def is_healthy(self) -> bool:
+        if time.monotonic() - self.checked_at < REPLICA_HEALTH_INTERVAL:
+            return self.healthy
+        # Aynı anda tek thread kontrol etsin, diğerleri son durumu kullansın
+        if not self._check_lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+            self._check_lock.release()
+        return self.healthy
+
+    def mark_down(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+
+class ReplicaRouter:
+    """
+    Okumaları sağlıklı replica'lara round-robin dağıtır; hiçbiri sağlıklı
+    değilse primary'ye düşer. Yakın zamanda yazan anahtarlar (ör. kullanıcı)
+    read-your-writes için primary'den okur.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [_Replica(url) for url in urls]
+        self._rr = itertools.count()
+        self._writes: dict = {}  # key -> son yazma zamanı (monotonic)
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """(replica | None, sessionmaker) döner; None = primary"""
+        n = len(self.replicas)
+        start = next(self._rr)
+        for i in range(n):
+            replica = self.replicas[(start + i) % n]
+            if replica.is_healthy():
+                return replica, replica.Session
+        return None, SessionLocal
+
+    def mark_write(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._writes[key] = now
+            # Süresi geçenleri arada bir temizle
+            if len(self._writes) > 10_000:
+                self._writes = {
+                    k: t for k, t in self._writes.items() if now - t < REPLICA_LAG_SECONDS
+                }
+
+    def recently_wrote(self, key) -> bool:
+        written_at = self._writes.get(key)
+        return written_at is not None and time.monotonic() - written_at < REPLICA_LAG_SECONDS
+
+
+read_router = ReplicaRouter(DATABASE_REPLICA_URLS)
+
+
 def init_db():
     # Base.metadata.create_all(bind=engine)  # İstersen sonra açarsın
     pass
@@ -30,3 +136,34 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _read_session(primary: bool):
+    replica, Session = (None, SessionLocal) if primary else read_router.pick()
+    db = Session()
+    try:
+        yield db
+    except DBAPIError as e:
+        # Bağlantı koptuysa replica'yı bir sonraki health check'e kadar devre dışı bırak
+        if replica is not None and e.connection_invalidated:
+            replica.mark_down()
+        raise
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """
+    GET endpoint'leri için: replica'dan okur.
+    'X-Read-Your-Writes: 1' header'ı ile primary zorlanabilir.
+    """
+    yield from _read_session(primary=request.headers.get("x-read-your-writes") == "1")
+
+
+def get_user_read_db(user_id: int, request: Request):
+    """Kullanıcıya özel okumalar: kullanıcı yakın zamanda yazdıysa primary'den."""
+    primary = (
+        request.headers.get("x-read-your-writes") == "1"
+        or read_router.recently_wrote(("user", user_id))
+    )
+    yield from _read_session(primary=primary)
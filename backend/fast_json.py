@@ -0,0 +1,128 @@
+# backend/fast_json.py
+"""
+Sıcak okuma endpoint'leri için hızlı JSON yolu (opt-in: FAST_JSON=1).
+
+- orjson varsa onunla, yoksa stdlib json ile bytes üretir
+- ORM satırları response_model doğrulamasından geçmeden düz dict'e çevrilir
+  (alan sırası ve Decimal -> "12.50" formatı Pydantic çıktısıyla aynı)
+- Katalog anlık görüntüleri (snapshot) bir kez encode edilip bytes olarak
+  saklanır; write endpoint'leri ilgili anahtarı düşürür
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson opsiyonel
+    orjson = None
+
+
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
+SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "1024"))
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"{type(obj).__name__} JSON'a çevrilemez")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """bytes verilirse olduğu gibi yazar, değilse dumps() ile encode eder"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+# -------------------------
+# ORM -> dict (MenuItemOut / RestaurantOut ile aynı alanlar)
+# -------------------------
+
+def menu_item_dict(item) -> dict:
+    return {
+        "name": item.name,
+        "price": item.price,
+        "allergy": item.allergy,
+        "description": item.description,
+        "food_id": item.food_id,
+    }
+
+
+def restaurant_dict(restaurant) -> dict:
+    return {
+        "restaurant_name": restaurant.restaurant_name,
+        "location": restaurant.location,
+        "price_range": restaurant.price_range,
+        "latitude": restaurant.latitude,
+        "longitude": restaurant.longitude,
+        "restaurant_id": restaurant.restaurant_id,
+        "menu_items": [menu_item_dict(m) for m in restaurant.menu_items],
+    }
+
+
+# -------------------------
+# Pre-encoded snapshot cache
+# -------------------------
+
+class SnapshotCache:
+    """
+    anahtar -> encode edilmiş bytes; LRU ile sınırlı.
+
+    Okuma DB'den snapshot üretirken araya bir write girerse eski veriyi
+    yazmamak için put(), okuma başında alınan generation'ı ister.
+    """
+
+    def __init__(self, max_entries: int = SNAPSHOT_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+            return body
+
+    def put(self, key, body: bytes, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._data[key] = body
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
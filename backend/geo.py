@@ -0,0 +1,175 @@
+# backend/geo.py
+"""
+Restoran konumları için basit grid (ızgara) index'i.
+
+Restaurant.location serbest metin; içinde "41.0082, 28.9784" gibi bir
+koordinat çifti varsa latitude/longitude kolonlarına yazılır.
+/chat ve /restaurants bir konum + yarıçap verilince önce yakındaki
+restoranları bu grid'den seçer, menü filtresi sonra uygulanır.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+# Hücre boyu (derece). 0.1° enlem ≈ 11 km
+GEO_CELL_DEG = float(os.getenv("GEO_CELL_DEG", "0.1"))
+EARTH_RADIUS_KM = 6371.0
+
+# İki sayı da ondalıklı olmalı ve virgül/noktalı virgülle ayrılmalı;
+# "No 45/2" gibi kapı/sokak numaraları koordinat sayılmasın
+_COORD_RE = re.compile(r"(?<![\d.])(-?\d{1,2}\.\d+)\s*[,;]\s*(-?\d{1,3}\.\d+)(?![\d.])")
+
+
+def parse_location(location: Optional[str]) -> Optional[tuple[float, float]]:
+    """'Kadıköy (40.99, 29.03)' -> (40.99, 29.03); koordinat yoksa None"""
+    if not location:
+        return None
+    for match in _COORD_RE.finditer(location):
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+    return None
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _restaurant_columns(engine) -> set:
+    return {c["name"] for c in inspect(engine).get_columns("restaurant")}
+
+
+def ensure_geo_columns(engine):
+    """
+    Eski veritabanlarına latitude/longitude kolonlarını ekler ve
+    location metninden doldurur (açılışta bir kez, idempotent).
+    """
+    try:
+        columns = _restaurant_columns(engine)
+    except Exception:
+        logger.exception("restaurant tablosu okunamadı, geo kolonları atlandı")
+        return
+
+    missing = [name for name in ("latitude", "longitude") if name not in columns]
+    if missing:
+        # Birden çok worker aynı anda açılabilir; Postgres'te IF NOT EXISTS,
+        # diğerlerinde hata olursa kolonlar yeniden okunur
+        if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+        try:
+            with engine.begin() as conn:
+                for name in missing:
+                    conn.execute(text(f"ALTER TABLE restaurant ADD COLUMN {if_not_exists}{name} FLOAT"))
+        except Exception:
+            if not set(missing) <= _restaurant_columns(engine):
+                logger.exception("geo kolonları eklenemedi")
+                return
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT restaurant_id, location FROM restaurant "
+                "WHERE latitude IS NULL AND location IS NOT NULL"
+            )
+        ).all()
+        updates = []
+        for rid, location in rows:
+            coords = parse_location(location)
+            if coords:
+                updates.append({"rid": rid, "lat": coords[0], "lon": coords[1]})
+        if updates:
+            conn.execute(
+                text("UPDATE restaurant SET latitude = :lat, longitude = :lon WHERE restaurant_id = :rid"),
+                updates,
+            )
+
+
+class GeoGrid:
+    """
+    (hücre_i, hücre_j) -> restoran id kümesi.
+    loader(db) -> [(restaurant_id, latitude, longitude), ...]
+    """
+
+    def __init__(self, loader: Callable, cell_deg: float = GEO_CELL_DEG):
+        self._loader = loader
+        self.cell_deg = cell_deg
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._cells: dict[tuple[int, int], set] = {}
+        self._pos: dict[int, tuple[float, float]] = {}
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def ensure_loaded(self, db):
+        if self._loaded:
+            return
+        # Yükleme kilit içinde (SafeMenuIndex gibi): arada gelen put/remove
+        # yükleme bitene kadar bekler, snapshot'tan sonra uygulanır
+        with self._lock:
+            if self._loaded:
+                return
+            for rid, lat, lon in self._loader(db):
+                self._put(rid, lat, lon)
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._cells.clear()
+            self._pos.clear()
+
+    def _put(self, rid: int, lat: Optional[float], lon: Optional[float]):
+        self._remove(rid)
+        if lat is None or lon is None:
+            return
+        self._pos[rid] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), set()).add(rid)
+
+    def _remove(self, rid: int):
+        old = self._pos.pop(rid, None)
+        if old is not None:
+            cell = self._cell(*old)
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(rid)
+                if not members:
+                    del self._cells[cell]
+
+    def put(self, rid: int, lat: Optional[float], lon: Optional[float]):
+        with self._lock:
+            if self._loaded:
+                self._put(rid, lat, lon)
+
+    def remove(self, rid: int):
+        with self._lock:
+            self._remove(rid)
+
+    def nearby(self, lat: float, lon: float, radius_km: float) -> list[int]:
+        """Yarıçap içindeki restoranlar, yakından uzağa"""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        i0, j0 = self._cell(lat - dlat, lon - dlon)
+        i1, j1 = self._cell(lat + dlat, lon + dlon)
+
+        found = []
+        with self._lock:
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    for rid in self._cells.get((i, j), ()):
+                        rlat, rlon = self._pos[rid]
+                        dist = haversine_km(lat, lon, rlat, rlon)
+                        if dist <= radius_km:
+                            found.append((dist, rid))
+        found.sort()
+        return [rid for _, rid in found]
@@ -4,18 +4,54 @@ from schemas import (
     RestaurantOut,
     MenuItemCreate,
     MenuItemOut,
+    MenuItemSearchPage,
 )
 from ollama_client import ask_ollama
-from fastapi import FastAPI, Depends, HTTPException
+from safe_menu import SafeMenuIndex
+from menu_store import MenuStore, format_cents, iter_bits
+from search import setup_search_index, search_menu_items
+from cache_bus import RESYNC, CacheBus, ChangeEvent, make_transport
+from rate_limit import RateLimitMiddleware
+from chat_log import ChatLogWriter
+from geo import GeoGrid, ensure_geo_columns, parse_location
+from profiling import Profiler, ProfiledRoute, ProfilingMiddleware, require_admin
+from warmup import (
+    WARMUP_DEFAULT_MESSAGE,
+    WARMUP_DEFAULT_RECOMMENDATION,
+    Warmup,
+    WarmedChat,
+    is_default_message,
+)
+from fast_json import (
+    FAST_JSON,
+    FastJSONResponse,
+    SnapshotCache,
+    dumps,
+    menu_item_dict,
+    restaurant_dict,
+)
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel, Field, field_validator, EmailStr
 from typing import List, Any, Optional
 import os
+import re
+import time
 import requests
 import bcrypt
 
-from database import get_db
+from database import (
+    SessionLocal,
+    engine,
+    get_db,
+    get_read_db,
+    get_user_read_db,
+    read_router,
+)
 
 
 from models import (
@@ -31,13 +67,38 @@ from models import (
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Eksik şema parçalarını kur (idempotent)
+    ensure_geo_columns(engine)
+    setup_search_index(engine)
+    cache_bus.start()
+    chat_log.start()
+    profiler.start()
+    warmup.start()
+    yield
+    warmup.stop()
+    profiler.stop()
+    chat_log.stop()  # tampondaki kayıtları yazar
+    cache_bus.stop()
+
 
 app = FastAPI(
     title="Meal Selector API",
     description="Kişiselleştirilmiş yemek önerisi API'si",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+# ---- Profiling ----
+# Endpoint'ler ProfiledRoute ile sarılır ki sampler doğru thread'i okusun
+app.router.route_class = ProfiledRoute
+profiler = Profiler()
+profiler.attach_engine(engine)
+for _replica in read_router.replicas:
+    profiler.attach_engine(_replica.engine)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
 
 # ---- CORS ----
 FRONTEND_ORIGINS = os.getenv(
@@ -47,6 +108,10 @@ FRONTEND_ORIGINS = os.getenv(
 
 origins = [origin.strip() for origin in FRONTEND_ORIGINS.split(",")]
 
+# ---- Rate limit ----
+# CORS'tan önce eklenir ki 429 cevapları da CORS header'larıyla dönsün
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -178,84 +243,296 @@ def _get_model_fields() -> dict:
         "preference_id": "preference_id",
     }
 
-def get_full_menu(db: Session):
-    results = (
+def get_menu_rows(db: Session):
+    """MenuStore.load formatında tüm katalog; restoran sırasıyla (ardışık slot'lar)"""
+    return (
         db.query(
             Restaurant.restaurant_id,
             Restaurant.restaurant_name,
             MenuItem.food_id,
-            MenuItem.name.label("food_name"),
+            MenuItem.name,
             MenuItem.price,
             MenuItem.allergy,
             MenuItem.description,
         )
         .join(MenuItem, MenuItem.restaurant_id == Restaurant.restaurant_id)
+        .order_by(Restaurant.restaurant_id, MenuItem.food_id)
+        .yield_per(1000)
+    )
+
+def get_user_profile_text(db: Session, user_id: int) -> tuple[str, str]:
+    """(diyet metni, sevdiği yemekler metni) - prompt için"""
+    diets = (
+        db.query(Diet.diet_name)
+        .join(UserDiet)
+        .filter(UserDiet.user_id == user_id)
         .all()
     )
 
-    menu = {}
-    for r in results:
-        if r.restaurant_id not in menu:
-            menu[r.restaurant_id] = {
-                "restaurant_name": r.restaurant_name,
-                "foods": []
-            }
+    preferences = (
+        db.query(FoodPreference.preference_name)
+        .join(UserFoodPreference)
+        .filter(UserFoodPreference.user_id == user_id)
+        .all()
+    )
 
-        menu[r.restaurant_id]["foods"].append({
-            "food_id": r.food_id,
-            "name": r.food_name,
-            "price": str(r.price) if r.price else None,
-            "allergy": r.allergy,
-            "description": r.description
-        })
+    diet_text = ", ".join([d[0] for d in diets]) or "Belirtilmemiş"
+    preference_text = ", ".join([p[0] for p in preferences]) or "Belirtilmemiş"
+    return diet_text, preference_text
 
-    return menu
 
-def filter_menu_by_allergen(menu: dict, user_allergens: list[str]):
-    safe_menu = {}
+def get_user_allergens(db: Session, user_id: int) -> list[str]:
+    allergens = (
+        db.query(Allergen.allergen_name)
+        .join(UserAllergen)
+        .filter(UserAllergen.user_id == user_id)
+        .all()
+    )
+    return [a[0] for a in allergens if a[0]]
+
+
+def _load_full_menu(_db: Session):
+    # Katalog process başına bir kez yüklenir; replica gecikmesine takılmasın diye primary'den
+    # Generator: satırlar yield_per ile akarak MenuStore.load'a gider
+    with SessionLocal() as db:
+        yield from get_menu_rows(db)
+
+
+# Kullanıcı -> güvenli yemek bitmap'i; write endpoint'leri artımlı günceller
+safe_menu_index = SafeMenuIndex(_load_full_menu, get_user_allergens)
+
+
+def _load_restaurant_positions(_db: Session):
+    with SessionLocal() as db:
+        return (
+            db.query(Restaurant.restaurant_id, Restaurant.latitude, Restaurant.longitude)
+            .filter(Restaurant.latitude.isnot(None), Restaurant.longitude.isnot(None))
+            .all()
+        )
+
 
-    for rid, data in menu.items():
-        safe_foods = []
+# Konum + yarıçap ile restoran ön seçimi (geo.py)
+restaurant_grid = GeoGrid(_load_restaurant_positions)
 
-        for food in data["foods"]:
-            if not food["allergy"]:
-                safe_foods.append(food)
-                continue
 
-            food_allergy = food["allergy"].lower()
-            if any(a in food_allergy for a in user_allergens):
-                continue  # ❌ alerjenli → atla
+def _fill_coordinates(restaurant: Restaurant):
+    """latitude/longitude verilmediyse location metninden doldur"""
+    if restaurant.latitude is None or restaurant.longitude is None:
+        coords = parse_location(restaurant.location)
+        restaurant.latitude, restaurant.longitude = coords if coords else (None, None)
 
-            safe_foods.append(food)
 
-        if safe_foods:
-            safe_menu[rid] = {
-                "restaurant_name": data["restaurant_name"],
-                "foods": safe_foods
-            }
+def _nearby_restaurant_ids(
+    db: Session, lat: Optional[float], lon: Optional[float], radius_km: float
+) -> Optional[list[int]]:
+    """Konum verilmediyse None (filtre yok), verildiyse yakındaki restoran id'leri"""
+    if lat is None and lon is None:
+        return None
+    if lat is None or lon is None:
+        raise HTTPException(status_code=400, detail="lat ve lon birlikte gönderilmeli")
+    restaurant_grid.ensure_loaded(db)
+    return restaurant_grid.nearby(lat, lon, radius_km)
 
-    return safe_menu
 
-def build_menu_text(menu: dict) -> str:
+def _index_menu_item(item: MenuItem, restaurant_name: Optional[str]):
+    safe_menu_index.upsert_food(
+        item.restaurant_id,
+        restaurant_name,
+        item.food_id,
+        item.name,
+        item.price,
+        item.allergy,
+        item.description,
+    )
+
+# FAST_JSON=1 iken /restaurants ve /restaurants/{id}/menu cevaplarının
+# encode edilmiş hali; anahtarlar: "restaurants", ("menu", restaurant_id)
+catalog_snapshots = SnapshotCache()
+
+
+def _invalidate_catalog(*restaurant_ids):
+    catalog_snapshots.invalidate(
+        "restaurants", *[("menu", rid) for rid in restaurant_ids if rid is not None]
+    )
+
+
+# Diğer worker'ların write'larını bu process'in cache'lerine uygula.
+# Bu worker'ın kendi write'ları endpoint içinde doğrudan uygulanır.
+cache_bus = CacheBus(make_transport(engine))
+
+
+def _apply_change(event: ChangeEvent):
+    if event.kind == RESYNC:
+        safe_menu_index.invalidate()
+        restaurant_grid.invalidate()
+        catalog_snapshots.clear()
+        warmup.clear()  # kaçırılan profil değişiklikleri olabilir
+        return
+
+    if event.kind == "user_profile":
+        safe_menu_index.forget_user(event.key)  # sonraki /chat DB'den yükler
+        warmup.cancel(event.key)
+        read_router.mark_write(("user", event.key))
+        return
+
+    with SessionLocal() as db:
+        if event.kind == "menu_item":
+            # Index yüklü değilse (ilk /chat öncesi, resync sonrası) yemeğin
+            # eski restoranı bilinemez: taşınmışsa eski menü snapshot'ı kalmasın
+            old_known = safe_menu_index.loaded
+            old_restaurant_id = safe_menu_index.restaurant_of(event.key)
+            item = db.get(MenuItem, event.key)
+            if item is None:
+                safe_menu_index.remove_food(event.key)
+            else:
+                _index_menu_item(item, item.restaurant.restaurant_name if item.restaurant else None)
+            if old_known or old_restaurant_id is not None:
+                _invalidate_catalog(old_restaurant_id, item.restaurant_id if item else None)
+            else:
+                catalog_snapshots.clear()
+
+        elif event.kind == "restaurant":
+            restaurant = db.get(Restaurant, event.key)
+            if restaurant is None:
+                safe_menu_index.remove_restaurant(event.key)
+                restaurant_grid.remove(event.key)
+            else:
+                safe_menu_index.set_restaurant_name(event.key, restaurant.restaurant_name)
+                restaurant_grid.put(event.key, restaurant.latitude, restaurant.longitude)
+            _invalidate_catalog(event.key)
+
+
+cache_bus.subscribe(_apply_change)
+
+
+_WORD_RE = re.compile(r"\w+")
+# (katalog sürümü, "kelime dizisi" -> food_id, en uzun isimdeki kelime sayısı)
+_dish_names = (None, {}, 0)
+
+
+def _dish_key(text: str) -> tuple:
+    return tuple(_WORD_RE.findall(text.lower()))
+
+
+def _dish_name_map():
+    """İsim haritası katalog değişmedikçe flush'lar arasında yeniden kullanılır."""
+    global _dish_names
+    version = safe_menu_index.version
+    if _dish_names[0] != version:
+        with safe_menu_index.lock:  # sadece kopyala; ayrıştırma kilit dışında
+            version = safe_menu_index.version
+            store = safe_menu_index.store
+            names, food_ids, live = list(store.names), store.food_ids[:], store.live
+        by_name = {}
+        for slot in iter_bits(live):
+            key = _dish_key(names[slot] or "")
+            if key:
+                by_name.setdefault(key, food_ids[slot])
+        _dish_names = (version, by_name, max(map(len, by_name), default=0))
+    return _dish_names[1], _dish_names[2]
+
+
+def _resolve_chosen_foods(replies: list[str]) -> list[Optional[int]]:
     """
-    SADECE SAFE menu almalıdır
+    Her cevapta adı geçen (en uzun) yemeğin food_id'si.
+    chat_log flush thread'inde batch başına bir kez çalışır: katalog taranmaz,
+    cevaptaki kelime dizileri isim haritasında aranır.
     """
-    lines = []
+    by_name, max_words = _dish_name_map()
+    result = []
+    for reply in replies:
+        words = _dish_key(reply or "")
+        best, best_len = None, 0
+        for start in range(len(words)):
+            for n in range(min(max_words, len(words) - start), best_len, -1):
+                food_id = by_name.get(words[start:start + n])
+                if food_id is not None:
+                    best, best_len = food_id, n
+                    break
+        result.append(best)
+    return result
+
+
+# /chat analitik logu: istek yolunda sadece bellekte tamponlanır
+chat_log = ChatLogWriter(engine, resolve_dishes=_resolve_chosen_foods)
+
+def build_menu_text(store: MenuStore, bitmap: int) -> str:
+    """
+    SADECE SAFE bitmap almalıdır (bkz. SafeMenuIndex.safe_foods)
+    """
+    by_restaurant: dict[int, list[str]] = {}
+
+    for slot in iter_bits(bitmap):
+        line = f"- {store.names[slot]}"
+        if store.descriptions[slot]:
+            line += f" ({store.descriptions[slot]})"
+        price = format_cents(store.price_cents[slot])
+        if price:
+            line += f" | Fiyat: {price} TL"
+        by_restaurant.setdefault(store.restaurant_ids[slot], []).append(line)
 
-    for data in menu.values():
-        lines.append(f"Restoran: {data['restaurant_name']}")
-        for f in data["foods"]:
-            line = f"- {f['name']}"
-            if f.get("description"):
-                line += f" ({f['description']})"
-            if f.get("price"):
-                line += f" | Fiyat: {f['price']} TL"
-            lines.append(line)
+    lines = []
+    for rid, foods in by_restaurant.items():
+        lines.append(f"Restoran: {store.restaurant_names.get(rid)}")
+        lines.extend(foods)
         lines.append("")  # boş satır
 
     return "\n".join(lines)
 
 
+def build_chat_prompt(diet_text: str, preference_text: str, menu_text: str, message: str) -> str:
+    return f"""
+Kullanıcı bilgileri:
+- Diyet: {diet_text}
+- Sevdiği yemekler: {preference_text}
+
+Aşağıda SADECE kullanıcının alerjenlerine UYGUN menü yer almaktadır:
+
+{menu_text}
+
+Kullanıcının mesajı:
+"{message}"
+
+Kurallar:
+- Yalnızca yukarıdaki menüden seçim yap
+- TEK bir yemek öner
+- Restoran adını ve yemek adını belirt
+- Kısa ve net açıkla
+"""
+
+
+def _warm_user(user_id: int, generation: int) -> Optional[WarmedChat]:
+    """
+    Warmup worker'ında çalışır: ilk /chat'in soğuk yolunu önceden yürütür.
+    Konum /profile'da bilinmediği için menü metni konumsuz hali içindir;
+    konumlu /chat'ler için sadece grid yüklenir.
+    """
+    with SessionLocal() as db:
+        diet_text, preference_text = get_user_profile_text(db, user_id)
+        safe_menu_index.prepare(db, user_id)
+        restaurant_grid.ensure_loaded(db)
+
+        if not warmup.is_current(user_id, generation):
+            return None
+        # Sürüm, bitmap ve metin aynı kilit içinde: metin tam olarak bu
+        # sürümün menüsü olur (bkz. /chat)
+        with safe_menu_index.lock:
+            store, bitmap = safe_menu_index.safe_foods(db, user_id)
+            version = safe_menu_index.version  # safe_foods yükleme yaptıysa artmış olur
+            menu_text = build_menu_text(store, bitmap) if bitmap else ""
+    entry = WarmedChat(generation, version, diet_text, preference_text, menu_text)
+
+    if WARMUP_DEFAULT_RECOMMENDATION and menu_text and warmup.is_current(user_id, generation):
+        prompt = build_chat_prompt(diet_text, preference_text, menu_text, WARMUP_DEFAULT_MESSAGE)
+        entry.reply = ask_ollama(prompt)
+        entry.prompt = prompt
+    return entry
+
+
+# /profile sonrası ilk /chat için arka planda ısıtma (warmup.py)
+warmup = Warmup(_warm_user)
+
+
 
 
 
@@ -388,6 +665,14 @@ def create_profile(profile: ProfileCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(user)
 
+    # Sadece bu kullanıcının güvenli menü anahtarı değişir
+    safe_menu_index.set_user_allergens(user.user_id, profile.allergens)
+    # Bir süre bu kullanıcının okumaları primary'den (read-your-writes)
+    read_router.mark_write(("user", user.user_id))
+    cache_bus.publish("user_profile", user.user_id)
+    # Kullanıcı sohbet sayfasına gelene kadar ilk /chat'in işini önceden yap
+    warmup.submit(user.user_id)
+
     return {"ok": True, "user_id": user.user_id}
 
 
@@ -397,18 +682,58 @@ def create_restaurant(
     db: Session = Depends(get_db)
 ):
     db_restaurant = Restaurant(**restaurant.dict())
+    _fill_coordinates(db_restaurant)
     db.add(db_restaurant)
     db.commit()
     db.refresh(db_restaurant)
+    restaurant_grid.put(
+        db_restaurant.restaurant_id, db_restaurant.latitude, db_restaurant.longitude
+    )
+    _invalidate_catalog()
+    cache_bus.publish("restaurant", db_restaurant.restaurant_id)
     return db_restaurant
 
 
 @app.get("/restaurants", response_model=list[RestaurantOut])
-def get_restaurants(db: Session = Depends(get_db)):
-    return db.query(Restaurant).all()
+def get_restaurants(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """lat/lon verilirse sadece radius_km içindeki restoranlar (yakından uzağa)"""
+    nearby = _nearby_restaurant_ids(db, lat, lon, radius_km)
+    if nearby is not None:
+        if not nearby:
+            return []
+        found = {
+            r.restaurant_id: r
+            for r in db.query(Restaurant)
+            .options(selectinload(Restaurant.menu_items))
+            .filter(Restaurant.restaurant_id.in_(nearby))
+        }
+        restaurants = [found[rid] for rid in nearby if rid in found]
+        if FAST_JSON:
+            return FastJSONResponse([restaurant_dict(r) for r in restaurants])
+        return restaurants
+
+    if not FAST_JSON:
+        return db.query(Restaurant).all()
+
+    body = catalog_snapshots.get("restaurants")
+    if body is None:
+        generation = catalog_snapshots.generation
+        # Snapshot süresiz tutulur; gecikmeli replica'dan doldurulmasın
+        with SessionLocal() as primary:
+            restaurants = (
+                primary.query(Restaurant).options(selectinload(Restaurant.menu_items)).all()
+            )
+            body = dumps([restaurant_dict(r) for r in restaurants])
+        catalog_snapshots.put("restaurants", body, generation)
+    return FastJSONResponse(body)
 
 @app.get("/restaurants/{restaurant_id}", response_model=RestaurantOut)
-def get_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
+def get_restaurant(restaurant_id: int, db: Session = Depends(get_read_db)):
     restaurant = (
         db.query(Restaurant)
         .filter(Restaurant.restaurant_id == restaurant_id)
@@ -431,9 +756,14 @@ def update_restaurant(
 
     for key, value in data.dict().items():
         setattr(restaurant, key, value)
+    _fill_coordinates(restaurant)
 
     db.commit()
     db.refresh(restaurant)
+    safe_menu_index.set_restaurant_name(restaurant.restaurant_id, restaurant.restaurant_name)
+    restaurant_grid.put(restaurant.restaurant_id, restaurant.latitude, restaurant.longitude)
+    _invalidate_catalog()
+    cache_bus.publish("restaurant", restaurant.restaurant_id)
     return restaurant
 
 
@@ -445,6 +775,10 @@ def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
 
     db.delete(restaurant)
     db.commit()
+    safe_menu_index.remove_restaurant(restaurant_id)
+    restaurant_grid.remove(restaurant_id)
+    _invalidate_catalog(restaurant_id)
+    cache_bus.publish("restaurant", restaurant_id)
     return {"message": "Restaurant deleted"}
 
 
@@ -461,16 +795,52 @@ def create_menu_item(
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    _index_menu_item(db_item, restaurant.restaurant_name)
+    _invalidate_catalog(db_item.restaurant_id)
+    cache_bus.publish("menu_item", db_item.food_id)
     return db_item
 
 
 @app.get("/restaurants/{restaurant_id}/menu", response_model=list[MenuItemOut])
-def get_menu_items(restaurant_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(MenuItem)
-        .filter(MenuItem.restaurant_id == restaurant_id)
-        .all()
+def get_menu_items(restaurant_id: int, db: Session = Depends(get_read_db)):
+    if not FAST_JSON:
+        return (
+            db.query(MenuItem)
+            .filter(MenuItem.restaurant_id == restaurant_id)
+            .all()
+        )
+
+    key = ("menu", restaurant_id)
+    body = catalog_snapshots.get(key)
+    if body is None:
+        generation = catalog_snapshots.generation
+        with SessionLocal() as primary:  # bkz. get_restaurants
+            items = primary.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
+            body = dumps([menu_item_dict(m) for m in items])
+        catalog_snapshots.put(key, body, generation)
+    return FastJSONResponse(body)
+
+
+@app.get("/menu-items/search", response_model=MenuItemSearchPage)
+def search_menu(
+    q: str = Query(..., min_length=1, max_length=100),
+    exclude_allergens: List[str] = Query(default_factory=list),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    name + description üzerinde sıralı arama (bkz. search.py)
+    - exclude_allergens: tekrar eden parametre ya da "süt,gluten"
+    - sayfalama: limit/offset, has_more ile sonraki sayfa var mı
+    """
+    allergens = [a.strip() for raw in exclude_allergens for a in raw.split(",") if a.strip()]
+    rows, has_more = search_menu_items(
+        db, q, allergens, min_price, max_price, limit, offset
     )
+    return {"items": rows, "limit": limit, "offset": offset, "has_more": has_more}
 
 
 @app.put("/menu-items/{food_id}", response_model=MenuItemOut)
@@ -482,12 +852,16 @@ def update_menu_item(
     item = db.query(MenuItem).get(food_id)
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    old_restaurant_id = item.restaurant_id
 
     for key, value in data.dict().items():
         setattr(item, key, value)
 
     db.commit()
     db.refresh(item)
+    _index_menu_item(item, item.restaurant.restaurant_name if item.restaurant else None)
+    _invalidate_catalog(old_restaurant_id, item.restaurant_id)
+    cache_bus.publish("menu_item", food_id)
     return item
 
 
@@ -497,69 +871,129 @@ def delete_menu_item(food_id: int, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
 
+    restaurant_id = item.restaurant_id
     db.delete(item)
     db.commit()
+    safe_menu_index.remove_food(food_id)
+    _invalidate_catalog(restaurant_id)
+    cache_bus.publish("menu_item", food_id)
     return {"message": "Menu item deleted"}
 
 
 @app.post("/chat")
-def chat(user_id: int, message: str, db: Session = Depends(get_db)):
-    # ---- Kullanıcı bilgileri ----
-    diets = (
-        db.query(Diet.diet_name)
-        .join(UserDiet)
-        .filter(UserDiet.user_id == user_id)
-        .all()
-    )
-
-    allergens = (
-        db.query(Allergen.allergen_name)
-        .join(UserAllergen)
-        .filter(UserAllergen.user_id == user_id)
-        .all()
-    )
-
-    preferences = (
-        db.query(FoodPreference.preference_name)
-        .join(UserFoodPreference)
-        .filter(UserFoodPreference.user_id == user_id)
-        .all()
-    )
+def chat(
+    user_id: int,
+    message: str,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=100),
+    db: Session = Depends(get_user_read_db),
+):
+    started = time.perf_counter()
 
-    diet_text = ", ".join([d[0] for d in diets]) or "Belirtilmemiş"
-    preference_text = ", ".join([p[0] for p in preferences]) or "Belirtilmemiş"
-    user_allergens = [a[0].lower() for a in allergens]
+    # ---- Kullanıcı bilgileri ----
+    # /profile sonrası ısıtıldıysa DB'ye gitmeden (warmup.py)
+    warm = warmup.get(user_id)
+    if warm is not None:
+        diet_text, preference_text = warm.diet_text, warm.preference_text
+    else:
+        diet_text, preference_text = get_user_profile_text(db, user_id)
+    profile_done = time.perf_counter()
 
     # ---- MENU ----
-    full_menu = get_full_menu(db)
-    safe_menu = filter_menu_by_allergen(full_menu, user_allergens)
-
-    if not safe_menu:
-        return {
-            "reply": "Maalesef alerjenlerine uygun yemek bulunamadı 😔"
-        }
+    # Alerjen filtresi önceden hesaplanmış bitmap'ten gelir (safe_menu.py)
+    cache_hit = safe_menu_index.is_cached(user_id)
+    safe_menu_index.prepare(db, user_id)
+
+    # Konum verildiyse sadece yakındaki restoranlar (prompt da küçülür)
+    nearby = _nearby_restaurant_ids(db, lat, lon, radius_km)
+
+    # Bitmap ve menü metni TEK kilit içinde: arada silinen bir yemeğin
+    # slot'u başka (alerjenli) bir yemeğe verilebilir
+    menu_text = None
+    with safe_menu_index.lock:
+        store, safe_bitmap = safe_menu_index.safe_foods(db, user_id)
+        if nearby is not None:
+            safe_bitmap &= store.restaurant_bitmap(nearby)
+        if safe_bitmap and (
+            warm is not None
+            and nearby is None
+            and warm.catalog_version == safe_menu_index.version
+        ):
+            menu_text = warm.menu_text
+        elif safe_bitmap:
+            menu_text = build_menu_text(store, safe_bitmap)
+
+    if not menu_text:
+        reply = "Maalesef alerjenlerine uygun yemek bulunamadı 😔"
+        now = time.perf_counter()
+        chat_log.record(
+            user_id, message, reply,
+            profile_ms=(profile_done - started) * 1000,
+            menu_ms=(now - profile_done) * 1000,
+            llm_ms=0.0,
+            total_ms=(now - started) * 1000,
+            cache_hit=cache_hit,
+        )
+        return {"reply": reply}
 
-    menu_text = build_menu_text(safe_menu)
+    menu_done = time.perf_counter()
 
     # ---- PROMPT ----
-    prompt = f"""
-Kullanıcı bilgileri:
-- Diyet: {diet_text}
-- Sevdiği yemekler: {preference_text}
+    prompt = build_chat_prompt(diet_text, preference_text, menu_text, message)
+
+    reply = None
+    if warm is not None and is_default_message(message):
+        # Aynı prompt için önceden üretilmiş öneri (tek kullanımlık)
+        reply = warmup.take_reply(user_id, build_chat_prompt(
+            diet_text, preference_text, menu_text, WARMUP_DEFAULT_MESSAGE
+        ))
+    if reply is None:
+        reply = ask_ollama(prompt)
+    llm_done = time.perf_counter()
+
+    chat_log.record(
+        user_id, message, reply,
+        profile_ms=(profile_done - started) * 1000,
+        menu_ms=(menu_done - profile_done) * 1000,
+        llm_ms=(llm_done - menu_done) * 1000,
+        total_ms=(llm_done - started) * 1000,
+        cache_hit=cache_hit,
+    )
+    if FAST_JSON:
+        return FastJSONResponse({"reply": reply})
+    return {"reply": reply}
 
-Aşağıda SADECE kullanıcının alerjenlerine UYGUN menü yer almaktadır:
 
-{menu_text}
+# -------------------------
+# Admin: profiling
+# -------------------------
 
-Kullanıcının mesajı:
-"{message}"
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    """Ring buffer'daki profiller (yeniden eskiye)"""
+    return [p.summary() for p in reversed(profiler.finished)]
 
-Kurallar:
-- Yalnızca yukarıdaki menüden seçim yap
-- TEK bir yemek öner
-- Restoran adını ve yemek adını belirt
-- Kısa ve net açıkla
-"""
 
-    reply = ask_ollama(prompt)
-    return {"reply": reply}
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_profile(profile_id: int):
+    p = profiler.get(profile_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {
+        **p.summary(),
+        "sql": [{"statement": stmt, "ms": ms} for stmt, ms in p.sql],
+    }
+
+
+@app.get(
+    "/admin/profiles/{profile_id}/folded",
+    dependencies=[Depends(require_admin)],
+    response_class=PlainTextResponse,
+)
+def get_profile_folded(profile_id: int):
+    """flamegraph.pl / speedscope ile açılabilen folded stack çıktısı"""
+    p = profiler.get(profile_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return p.folded()
@@ -0,0 +1,194 @@
+# backend/menu_store.py
+"""
+Büyük kataloglar için kolon bazlı (array) menü deposu.
+
+Her yemek bir slot'a oturur; alanlar paralel dizilerde tutulur:
+  food_ids / restaurant_ids / price_cents -> array('q')  (fiyat yoksa -1)
+  names / descriptions / allergies        -> list[str]   (sys.intern'li)
+Filtreler slot bitmap'i (Python int) döner, yemek başına dict üretilmez.
+build_menu_text ve /chat bu depodan okur.
+"""
+
+import sys
+from array import array
+from decimal import Decimal
+from typing import Iterable, Optional
+
+NO_PRICE = -1
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def to_cents(price) -> int:
+    if price is None:
+        return NO_PRICE
+    return int((Decimal(price) * 100).to_integral_value())
+
+
+def format_cents(cents: int) -> Optional[str]:
+    """Eski str(Decimal) formatı: 4550 -> '45.50'; fiyatsız/0 -> None"""
+    if cents <= 0:
+        return None
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def _to_bitmap(flags: bytearray) -> int:
+    """b"0110" (slot 0 solda) -> int bitmap; bit bit OR'lamaktan çok daha ucuz"""
+    if not flags:
+        return 0
+    flags.reverse()
+    return int(flags, 2)
+
+
+def iter_bits(bitmap: int):
+    """Bitmap'teki 1 olan slot numaralarını küçükten büyüğe döner."""
+    bits = bin(bitmap)[:1:-1]  # '0b' at, en düşük bit başa gelsin
+    pos = bits.find("1")
+    while pos != -1:
+        yield pos
+        pos = bits.find("1", pos + 1)
+
+
+class MenuStore:
+    """Thread-safe değildir; kilitleme çağıran taraftadır (SafeMenuIndex)."""
+
+    def __init__(self):
+        self.food_ids = array("q")
+        self.restaurant_ids = array("q")
+        self.price_cents = array("q")
+        self.names: list = []
+        self.descriptions: list = []
+        self.allergies: list = []
+
+        self.slot_of: dict[int, int] = {}  # food_id -> slot
+        self.live = 0  # dolu slot'ların bitmap'i
+        self.restaurant_names: dict[int, str] = {}
+        self._restaurant_bits: dict[int, int] = {}  # restaurant_id -> slot bitmap
+        self._free: list[int] = []
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    # -------------------------
+    # Yazma
+    # -------------------------
+
+    def load(self, rows: Iterable):
+        """
+        Boş depoya toplu yükleme.
+        rows: (restaurant_id, restaurant_name, food_id, name, price, allergy, description)
+        restaurant_id'ye göre sıralı gelirse her restoranın slot'ları ardışık
+        olur ve bitmap'i tek bir aralık maskesiyle kurulur.
+        """
+        run_rid, run_start = None, 0
+        for rid, rname, food_id, name, price, allergy, description in rows:
+            slot = len(self.food_ids)
+            if rid != run_rid:
+                self._add_run(run_rid, run_start, slot)
+                run_rid, run_start = rid, slot
+                self.set_restaurant_name(rid, rname)
+            self.food_ids.append(food_id)
+            self.restaurant_ids.append(rid)
+            self.price_cents.append(to_cents(price))
+            self.names.append(_intern(name))
+            self.descriptions.append(description or None)
+            self.allergies.append(_intern(allergy.lower()) if allergy else None)
+            self.slot_of[food_id] = slot
+        self._add_run(run_rid, run_start, len(self.food_ids))
+        self.live = (1 << len(self.food_ids)) - 1
+
+    def _add_run(self, rid, start: int, end: int):
+        if rid is not None and end > start:
+            mask = ((1 << (end - start)) - 1) << start
+            self._restaurant_bits[rid] = self._restaurant_bits.get(rid, 0) | mask
+
+    def set_restaurant_name(self, restaurant_id: int, name: Optional[str]):
+        self.restaurant_names[restaurant_id] = _intern(name)
+
+    def upsert(self, restaurant_id, food_id, name, price, allergy, description) -> int:
+        slot = self.slot_of.get(food_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self.food_ids)
+                self.food_ids.append(0)
+                self.restaurant_ids.append(0)
+                self.price_cents.append(NO_PRICE)
+                self.names.append(None)
+                self.descriptions.append(None)
+                self.allergies.append(None)
+            self.slot_of[food_id] = slot
+        else:
+            self._drop_restaurant_bit(slot)
+
+        bit = 1 << slot
+        self.food_ids[slot] = food_id
+        self.restaurant_ids[slot] = restaurant_id
+        self.price_cents[slot] = to_cents(price)
+        self.names[slot] = _intern(name)
+        self.descriptions[slot] = description or None
+        self.allergies[slot] = _intern(allergy.lower()) if allergy else None
+        self.live |= bit
+        self._restaurant_bits[restaurant_id] = self._restaurant_bits.get(restaurant_id, 0) | bit
+        return slot
+
+    def remove(self, food_id: int) -> Optional[int]:
+        slot = self.slot_of.pop(food_id, None)
+        if slot is None:
+            return None
+        self._drop_restaurant_bit(slot)
+        self.live &= ~(1 << slot)
+        self.names[slot] = self.descriptions[slot] = self.allergies[slot] = None
+        self._free.append(slot)
+        return slot
+
+    def _drop_restaurant_bit(self, slot: int):
+        rid = self.restaurant_ids[slot]
+        bits = self._restaurant_bits.get(rid, 0) & ~(1 << slot)
+        if bits:
+            self._restaurant_bits[rid] = bits
+        else:
+            self._restaurant_bits.pop(rid, None)
+
+    def remove_restaurant(self, restaurant_id: int) -> int:
+        """Restoranın tüm yemeklerini siler, silinen slot'ların bitmap'ini döner."""
+        bits = self._restaurant_bits.get(restaurant_id, 0)
+        for slot in iter_bits(bits):
+            self.remove(self.food_ids[slot])
+        self.restaurant_names.pop(restaurant_id, None)
+        return bits
+
+    # -------------------------
+    # Okuma / filtreler (hepsi slot bitmap'i döner)
+    # -------------------------
+
+    def restaurant_of(self, food_id: int) -> Optional[int]:
+        slot = self.slot_of.get(food_id)
+        return None if slot is None else self.restaurant_ids[slot]
+
+    def allergen_bitmap(self, allergen: str) -> int:
+        """allergy metninde allergen alt-dizesi geçen yemekler (küçük harf)"""
+        flags = bytearray(b"0" * len(self.allergies))
+        for slot, allergy in enumerate(self.allergies):
+            if allergy and allergen in allergy:
+                flags[slot] = 0x31  # "1"
+        return _to_bitmap(flags) & self.live
+
+    def price_bitmap(self, min_cents: Optional[int] = None, max_cents: Optional[int] = None) -> int:
+        """min_cents <= fiyat <= max_cents olan yemekler; fiyatsızlar hiç eşleşmez"""
+        lo = 0 if min_cents is None else min_cents
+        hi = sys.maxsize if max_cents is None else max_cents
+        flags = bytearray(b"0" * len(self.price_cents))
+        for slot, cents in enumerate(self.price_cents):
+            if cents != NO_PRICE and lo <= cents <= hi:
+                flags[slot] = 0x31
+        return _to_bitmap(flags) & self.live
+
+    def restaurant_bitmap(self, restaurant_ids: Iterable[int]) -> int:
+        bitmap = 0
+        for rid in restaurant_ids:
+            bitmap |= self._restaurant_bits.get(rid, 0)
+        return bitmap
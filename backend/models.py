@@ -1,6 +1,6 @@
 # backend/models.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Numeric
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Numeric, Float, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -108,6 +108,8 @@ class Restaurant(Base):
     restaurant_name = Column(String(150), nullable=False)
     location = Column(Text)
     price_range = Column(String(50))
+    latitude = Column(Float, nullable=True)  # location'dan doldurulur (geo.py)
+    longitude = Column(Float, nullable=True)
 
     menu_items = relationship(
         "MenuItem",
@@ -141,3 +143,36 @@ class MenuItem(Base):
 
 
 
+# =====================
+# CACHE EVENT (cache_bus.py tablo transport'u)
+# =====================
+class CacheEvent(Base):
+    __tablename__ = "cache_event"
+    # event_id versiyon olarak kullanılıyor: SQLite tablo boşalınca id'leri
+    # baştan vermesin (AUTOINCREMENT yoksa max(rowid) + 1)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    event_id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)
+    key = Column(Integer, nullable=True)
+    origin = Column(String(32), nullable=False)
+    created_at = Column(Float, nullable=False, index=True)  # time.time()
+
+
+# =====================
+# CHAT LOG (analitik, append-only; chat_log.py toplu yazar)
+# =====================
+class ChatLog(Base):
+    __tablename__ = "chatlog"
+
+    log_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, index=True)
+    message = Column(Text)
+    reply = Column(Text)
+    chosen_food_id = Column(Integer, nullable=True)  # cevapta geçen yemek
+    profile_ms = Column(Float)
+    menu_ms = Column(Float)
+    llm_ms = Column(Float)
+    total_ms = Column(Float)
+    cache_hit = Column(Boolean)  # güvenli menü hazır bitmap'ten mi geldi
+    created_at = Column(DateTime, index=True)
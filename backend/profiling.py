@@ -0,0 +1,260 @@
+# backend/profiling.py
+"""
+Production'da yeniden deploy etmeden yavaşlık teşhisi.
+
+- Sampling profiler: ayrı bir thread PROFILE_INTERVAL_MS'de bir, profillenen
+  isteklerin endpoint thread'inin stack'ini okur (sys._current_frames)
+- Hangi istekler profillenir:
+    * PROFILE_SAMPLE_RATE oranında rastgele istekler
+    * "X-Profile: 1" + geçerli "X-Admin-Token" header'lı tek istek
+    * SLOW_REQUEST_MS'yi aşan her istek (eşik aşıldığı andan itibaren)
+- Her isteğin SQL ifadeleri engine event hook'larıyla süreleriyle toplanır
+- Sonuçlar sınırlı bir ring buffer'da; stack'ler flamegraph "folded"
+  formatında (a;b;c 12) alınabilir
+"""
+
+import functools
+import hmac
+import inspect
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "2000"))
+PROFILE_BUFFER = int(os.getenv("PROFILE_BUFFER", "50"))
+MAX_SQL_PER_REQUEST = 200
+MAX_STACK_DEPTH = 128
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """ADMIN_TOKEN tanımlı değilse admin endpoint'leri tamamen kapalıdır."""
+    if not ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Yetkisiz")
+
+
+class RequestProfile:
+    __slots__ = (
+        "profile_id", "method", "path", "started", "started_at", "thread_id",
+        "sampled", "reason", "duration_ms", "stacks", "sql",
+    )
+
+    def __init__(self, profile_id: int, method: str, path: str, sampled: Optional[str]):
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.thread_id = None  # endpoint çalışırken dolu
+        self.sampled = sampled  # "header" | "random" | None
+        self.reason = sampled
+        self.duration_ms = 0.0
+        self.stacks: Counter = Counter()
+        self.sql: list = []  # (statement, süre ms)
+
+    def summary(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.stacks.values()),
+            "sql_count": len(self.sql),
+            "sql_ms": round(sum(ms for _, ms in self.sql), 2),
+        }
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profiler:
+    def __init__(self):
+        self.finished: deque = deque(maxlen=PROFILE_BUFFER)
+        self._active: dict[int, RequestProfile] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._has_active = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------------------------
+    # Sampler thread
+    # -------------------------
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._has_active.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        interval = PROFILE_INTERVAL_MS / 1000
+        slow = SLOW_REQUEST_MS / 1000
+        while not self._stop.is_set():
+            self._has_active.wait()  # hiç istek yokken uyumaz, bekler
+            if self._stop.wait(interval):
+                break
+            now = time.perf_counter()
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._has_active.clear()
+                    continue
+            targets = [
+                p for p in active
+                if p.thread_id is not None and (p.sampled or now - p.started >= slow)
+            ]
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for p in targets:
+                frame = frames.get(p.thread_id)
+                if frame is not None:
+                    p.stacks[_fold(frame)] += 1
+
+    # -------------------------
+    # İstek yaşam döngüsü
+    # -------------------------
+
+    def begin(self, method: str, path: str, sampled: Optional[str]) -> RequestProfile:
+        p = RequestProfile(next(self._ids), method, path, sampled)
+        with self._lock:
+            self._active[p.profile_id] = p
+        self._has_active.set()
+        return p
+
+    def end(self, p: RequestProfile):
+        p.duration_ms = (time.perf_counter() - p.started) * 1000
+        with self._lock:
+            self._active.pop(p.profile_id, None)
+        if p.duration_ms >= SLOW_REQUEST_MS and not p.reason:
+            p.reason = "slow"
+        if p.reason:
+            self.finished.append(p)
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        for p in list(self.finished):
+            if p.profile_id == profile_id:
+                return p
+        return None
+
+    # -------------------------
+    # SQL hook'ları
+    # -------------------------
+
+    def attach_engine(self, engine):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    p = _current.get()
+    if p is None:
+        return
+    starts = conn.info.get("profile_query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if len(p.sql) < MAX_SQL_PER_REQUEST:
+        p.sql.append((statement, round(elapsed_ms, 3)))
+
+
+# -------------------------
+# ASGI middleware + route class
+# -------------------------
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        sampled = None
+        if headers.get(b"x-profile") == b"1":
+            token = headers.get(b"x-admin-token", b"").decode("latin-1")
+            if ADMIN_TOKEN and hmac.compare_digest(token, ADMIN_TOKEN):
+                sampled = "header"
+        if sampled is None and PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            sampled = "random"
+
+        p = self.profiler.begin(scope["method"], scope["path"], sampled)
+        reset = _current.set(p)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(reset)
+            self.profiler.end(p)
+
+
+def _bind_thread(endpoint):
+    """Endpoint hangi thread'de çalışıyorsa sampler onun stack'ini okusun."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            p = _current.get()
+            if p is not None:
+                p.thread_id = threading.get_ident()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if p is not None:
+                    p.thread_id = None
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        p = _current.get()
+        if p is not None:
+            p.thread_id = threading.get_ident()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            if p is not None:
+                p.thread_id = None
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _bind_thread(endpoint), **kwargs)
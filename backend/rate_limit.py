@@ -0,0 +1,188 @@
+# backend/rate_limit.py
+"""
+Route + kimlik bazlı token-bucket rate limiting ve /chat için admission control.
+
+Kurallar "istek sayısı/saniye" formatında env'den okunur (RATE_LIMIT_CHAT=10/60:
+60 saniyede 10 istek).
+Kimlik: her zaman istemci IP'si. user_id / "Authorization: user_<id>"
+istemcinin kendi beyanı (gizli değil), bu yüzden tek başına anahtar olamaz;
+/chat'te IP bucket'ına EK olarak kullanıcı başına bir bucket daha tutulur.
+
+Bucket store'u değiştirilebilir (backend=): çok worker'lı kurulumlarda
+limitleri paylaşmak için take() imzasına uyan ortak bir store verilebilir.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+
+
+def _parse_rule(value: str):
+    """'10/60' -> (capacity=10, refill_per_sec=10/60)"""
+    count, seconds = value.split("/")
+    capacity = float(count)
+    return capacity, capacity / float(seconds)
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+DEFAULT_RULES = {
+    ("POST", "/chat"): _parse_rule(os.getenv("RATE_LIMIT_CHAT", "10/60")),
+    ("POST", "/login"): _parse_rule(os.getenv("RATE_LIMIT_LOGIN", "5/60")),
+    ("POST", "/register"): _parse_rule(os.getenv("RATE_LIMIT_REGISTER", "3/60")),
+}
+
+# IP'ye ek olarak beyan edilen kullanıcı başına da sınırlanan route'lar
+PER_USER_ROUTES = {("POST", "/chat")}
+
+# Aynı anda en fazla kaç /chat Ollama'ya gidebilir (0 = sınırsız)
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "4"))
+
+
+# -------------------------
+# Bucket store
+# -------------------------
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "full_at")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.full_at = updated  # bu andan sonra bucket yeni açılmışla aynı
+
+
+class MemoryBackend:
+    """
+    Process içi store. Dolu hale gelmiş (yani yeni açılmışla aynı) bucket'lar
+    sweep_interval'da bir silinir; bellek sadece aktif kimlik sayısı kadar.
+    """
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._buckets: dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+
+    def take(self, key: str, capacity: float, refill_per_sec: float, cost: float = 1.0) -> float:
+        """Token alabilirse 0, alamazsa kaç saniye sonra tekrar denenebileceğini döner."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self._sweep_interval:
+                self._sweep(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(capacity, now)
+            else:
+                bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * refill_per_sec)
+                bucket.updated = now
+
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                bucket.full_at = now + (capacity - bucket.tokens) / refill_per_sec
+                return 0.0
+            return (cost - bucket.tokens) / refill_per_sec
+
+    def _sweep(self, now: float):
+        self._buckets = {k: b for k, b in self._buckets.items() if b.full_at > now}
+        self._last_sweep = now
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# -------------------------
+# Middleware
+# -------------------------
+
+def _client_ip(scope) -> str:
+    headers = dict(scope.get("headers") or [])
+    if RATE_LIMIT_TRUST_PROXY and b"x-forwarded-for" in headers:
+        return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def _claimed_user(scope) -> Optional[str]:
+    """İstemcinin beyan ettiği kullanıcı; doğrulanmamış, sadece ek boyut"""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    user_id = query.get("user_id", [None])[0]
+    if user_id and user_id.isdigit():
+        return f"u:{user_id}"
+
+    headers = dict(scope.get("headers") or [])
+    auth = headers.get(b"authorization", b"").decode("latin-1").split()
+    if auth and auth[-1].startswith("user_") and auth[-1][5:].isdigit():
+        return f"u:{auth[-1][5:]}"
+    return None
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        rules: Optional[dict] = None,
+        backend=None,
+        chat_max_in_flight: int = CHAT_MAX_IN_FLIGHT,
+    ):
+        self.app = app
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self.backend = backend or MemoryBackend()
+        self.chat_max_in_flight = chat_max_in_flight
+        self._chat_in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+
+        route = (scope["method"], scope["path"])
+        rule = self.rules.get(route)
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        capacity, refill_per_sec = rule
+        # user_id değiştirerek yeni bucket alınamasın: IP her zaman sayılır
+        keys = [f"{scope['path']}|{_client_ip(scope)}"]
+        if route in PER_USER_ROUTES:
+            user = _claimed_user(scope)
+            if user is not None:
+                keys.append(f"{scope['path']}|{user}")
+        retry_after = 0.0
+        for key in keys:
+            retry_after = self.backend.take(key, capacity, refill_per_sec)
+            if retry_after > 0:
+                break
+        if retry_after > 0:
+            return await _reject(send, 429, "Çok fazla istek. Lütfen biraz bekleyin.", retry_after)
+
+        if route != ("POST", "/chat") or not self.chat_max_in_flight:
+            return await self.app(scope, receive, send)
+
+        # Admission control: Ollama'yı tek bir istemcinin doldurmasını engelle
+        if self._chat_in_flight >= self.chat_max_in_flight:
+            return await _reject(send, 503, "Sunucu şu an meşgul. Lütfen tekrar deneyin.", 1)
+        self._chat_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._chat_in_flight -= 1
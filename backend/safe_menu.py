@@ -0,0 +1,209 @@
+# backend/safe_menu.py
+"""
+Kullanıcı -> güvenli yemek (food_id) kümesinin bellekte tutulan, artımlı
+güncellenen hali.
+
+Her /chat çağrısında UserAllergen + MenuItem.allergy birleşimini baştan
+hesaplamak yerine:
+  - katalog MenuStore'da (menu_store.py) tutulur, her yemek bir slot/bit,
+  - her alerjen için "bu alerjeni içeren yemekler" bitmap'i tutulur,
+  - aynı alerjen kümesine sahip kullanıcılar tek bir güvenli bitmap'i paylaşır.
+
+/profile bir kullanıcının alerjenlerini değiştirince sadece o kullanıcı,
+bir yemeğin allergy metni değişince sadece o yemeğin biti güncellenir.
+"""
+
+import threading
+from typing import Callable, Iterable, Optional
+
+from menu_store import MenuStore
+
+
+class SafeMenuIndex:
+    """
+    menu_loader(db)          -> MenuStore.load formatında satırlar
+    allergen_loader(db, uid) -> kullanıcının alerjen isimleri
+    """
+
+    def __init__(self, menu_loader: Callable, allergen_loader: Callable):
+        self._menu_loader = menu_loader
+        self._allergen_loader = allergen_loader
+        self._lock = threading.RLock()
+        # Katalogdaki her değişiklikte artar; store'dan türetilmiş
+        # önbellekler (ör. warmup menü metni) bununla doğrulanır
+        self.version = 0
+        self._reset()
+
+    def _reset(self):
+        self._loaded = False
+        self.store = MenuStore()
+        self._unsafe: dict[str, int] = {}  # alerjen -> içeren yemekler
+        self._user_keys: dict[int, frozenset] = {}  # user_id -> alerjen kümesi
+        self._safe: dict[frozenset, int] = {}  # alerjen kümesi -> güvenli yemekler
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def lock(self):
+        """store'dan okuyan kod (ör. build_menu_text) bu kilidi tutmalı"""
+        return self._lock
+
+    # -------------------------
+    # Yükleme
+    # -------------------------
+
+    def ensure_loaded(self, db):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # Yarıda kalan yükleme (ör. bağlantı koptu) eski store'u kirletmesin:
+            # yeni store'a yüklenir, sadece başarılıysa yerine konur
+            store = MenuStore()
+            store.load(self._menu_loader(db))
+            self.store = store
+            self._unsafe.clear()
+            self._safe.clear()
+            self._loaded = True
+            self.version += 1  # boş store'dan türetilmiş önbellekler de yenilensin
+
+    def invalidate(self):
+        """Tüm katalog + kullanıcı eşlemelerini düşürür; sonraki istekte yeniden yüklenir."""
+        with self._lock:
+            self._reset()
+            self.version += 1
+
+    # -------------------------
+    # Menü değişiklikleri (sadece etkilenen yemek)
+    # -------------------------
+
+    def upsert_food(
+        self,
+        restaurant_id: int,
+        restaurant_name: Optional[str],
+        food_id: int,
+        name: str,
+        price,
+        allergy: Optional[str],
+        description: Optional[str],
+    ):
+        with self._lock:
+            if not self._loaded:
+                return  # ilk istekte zaten güncel haliyle yüklenecek
+            store = self.store
+            self.version += 1
+            store.set_restaurant_name(restaurant_id, restaurant_name)
+            slot = store.upsert(restaurant_id, food_id, name, price, allergy, description)
+
+            bit = 1 << slot
+            allergy = store.allergies[slot]
+            for allergen, bitmap in self._unsafe.items():
+                if allergy and allergen in allergy:
+                    self._unsafe[allergen] = bitmap | bit
+                else:
+                    self._unsafe[allergen] = bitmap & ~bit
+            for key, bitmap in self._safe.items():
+                if allergy and any(a in allergy for a in key):
+                    self._safe[key] = bitmap & ~bit
+                else:
+                    self._safe[key] = bitmap | bit
+
+    def _clear_bits(self, mask: int):
+        for allergen in self._unsafe:
+            self._unsafe[allergen] &= mask
+        for key in self._safe:
+            self._safe[key] &= mask
+
+    def remove_food(self, food_id: int):
+        with self._lock:
+            slot = self.store.remove(food_id)
+            if slot is not None:
+                self.version += 1
+                self._clear_bits(~(1 << slot))
+
+    def restaurant_of(self, food_id: int) -> Optional[int]:
+        with self._lock:
+            return self.store.restaurant_of(food_id)
+
+    def set_restaurant_name(self, restaurant_id: int, name: str):
+        with self._lock:
+            if restaurant_id in self.store.restaurant_names:
+                self.version += 1
+                self.store.set_restaurant_name(restaurant_id, name)
+
+    def remove_restaurant(self, restaurant_id: int):
+        with self._lock:
+            removed = self.store.remove_restaurant(restaurant_id)
+            if removed:
+                self.version += 1
+                self._clear_bits(~removed)
+
+    # -------------------------
+    # Kullanıcı değişiklikleri (sadece etkilenen kullanıcı)
+    # -------------------------
+
+    def set_user_allergens(self, user_id: int, allergens: Iterable[str]) -> frozenset:
+        key = frozenset(a.strip().lower() for a in allergens if a and a.strip())
+        with self._lock:
+            self._user_keys[user_id] = key
+            if self._loaded:
+                self._safe_bitmap(key)
+        return key
+
+    def forget_user(self, user_id: int):
+        with self._lock:
+            self._user_keys.pop(user_id, None)
+
+    def _unsafe_bitmap(self, allergen: str) -> int:
+        bitmap = self._unsafe.get(allergen)
+        if bitmap is None:
+            # Yeni alerjen: katalog bir kez taranır, sonra artımlı tutulur
+            bitmap = self._unsafe[allergen] = self.store.allergen_bitmap(allergen)
+        return bitmap
+
+    def _safe_bitmap(self, key: frozenset) -> int:
+        bitmap = self._safe.get(key)
+        if bitmap is None:
+            unsafe = 0
+            for allergen in key:
+                unsafe |= self._unsafe_bitmap(allergen)
+            bitmap = self._safe[key] = self.store.live & ~unsafe
+        return bitmap
+
+    # -------------------------
+    # Okuma
+    # -------------------------
+
+    def is_cached(self, user_id: int) -> bool:
+        """Kullanıcının güvenli bitmap'i DB'ye gitmeden hazır mı"""
+        key = self._user_keys.get(user_id)
+        return self._loaded and key is not None and key in self._safe
+
+    def prepare(self, db, user_id: int) -> frozenset:
+        """
+        Kullanıcının alerjen anahtarını ve kataloğu yükler (DB'ye gidebilir).
+        safe_foods'tan önce, kilit DIŞINDA çağrılır.
+        """
+        key = self._user_keys.get(user_id)
+        if key is None:
+            key = self.set_user_allergens(user_id, self._allergen_loader(db, user_id))
+        self.ensure_loaded(db)
+        return key
+
+    def safe_foods(self, db, user_id: int) -> tuple[MenuStore, int]:
+        """
+        (store, bitmap): kullanıcının yiyebileceği yemeklerin slot bitmap'i.
+
+        Çağıran self.lock'u tutmalı ve bitmap'i aynı kilit içinde kullanmalı:
+        kilit bırakılınca silinen bir yemeğin slot'u başka bir yemeğe
+        verilebilir ve eski bitmap o yemeği "güvenli" gösterir.
+        """
+        with self._lock:
+            key = self._user_keys.get(user_id)
+            if key is None:  # prepare() sonrası forget_user geldiyse
+                key = self.prepare(db, user_id)
+            self.ensure_loaded(db)
+            return self.store, self._safe_bitmap(key) & self.store.live
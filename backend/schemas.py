@@ -31,6 +31,8 @@ class RestaurantBase(BaseModel):
     restaurant_name: str
     location: Optional[str] = None
     price_range: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 class RestaurantCreate(RestaurantBase):
@@ -43,3 +45,21 @@ class RestaurantOut(RestaurantBase):
 
     class Config:
         from_attributes = True
+
+
+# =====================
+# MENU SEARCH
+# =====================
+class MenuItemSearchHit(MenuItemOut):
+    restaurant_id: int
+    restaurant_name: str
+
+    class Config:
+        from_attributes = True
+
+
+class MenuItemSearchPage(BaseModel):
+    items: List[MenuItemSearchHit] = []
+    limit: int
+    offset: int
+    has_more: bool
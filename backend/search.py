@@ -0,0 +1,224 @@
+# backend/search.py
+"""
+MenuItem.name + description üzerinde sıralı full-text arama.
+
+- SQLite  : menuitem_fts (FTS5, external content) + insert/update/delete trigger'ları
+- Postgres: menuitem.search_tsv (GENERATED tsvector) + GIN index
+- Diğer   : LIKE ile yedek arama (index yok, sadece küçük kataloglar için)
+
+İndeks trigger / generated column ile tutulduğu için write endpoint'lerinin
+ayrıca bir şey yapmasına gerek yok.
+"""
+
+import logging
+import os
+import re
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Numeric, bindparam, text
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_TOKENS = 8
+# exclude_allergens'lı aramada en fazla kaç aday satır okunur
+SEARCH_MAX_SCAN = int(os.getenv("SEARCH_MAX_SCAN", "2000"))
+
+# setup_search_index sonrası: "fts5" | "tsvector" | "like"
+search_backend = "like"
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS menuitem_fts USING fts5(
+        name, description,
+        content='menuitem', content_rowid='food_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS menuitem_fts_ai AFTER INSERT ON menuitem BEGIN
+        INSERT INTO menuitem_fts(rowid, name, description)
+        VALUES (new.food_id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS menuitem_fts_ad AFTER DELETE ON menuitem BEGIN
+        INSERT INTO menuitem_fts(menuitem_fts, rowid, name, description)
+        VALUES ('delete', old.food_id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS menuitem_fts_au AFTER UPDATE OF name, description ON menuitem BEGIN
+        INSERT INTO menuitem_fts(menuitem_fts, rowid, name, description)
+        VALUES ('delete', old.food_id, old.name, old.description);
+        INSERT INTO menuitem_fts(rowid, name, description)
+        VALUES (new.food_id, new.name, new.description);
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE menuitem ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_menuitem_search_tsv ON menuitem USING GIN (search_tsv)",
+]
+
+
+def setup_search_index(engine) -> str:
+    """Uygulama açılışında çağrılır; idempotent."""
+    global search_backend
+
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'menuitem_fts'"
+                ).first()
+                for stmt in _SQLITE_DDL:
+                    conn.exec_driver_sql(stmt)
+                if not exists:
+                    # Mevcut satırları ilk kez indeksle
+                    conn.exec_driver_sql(
+                        "INSERT INTO menuitem_fts(menuitem_fts) VALUES ('rebuild')"
+                    )
+                search_backend = "fts5"
+            elif dialect == "postgresql":
+                for stmt in _POSTGRES_DDL:
+                    conn.exec_driver_sql(stmt)
+                search_backend = "tsvector"
+            else:
+                search_backend = "like"
+    except Exception:
+        logger.exception("Full-text index kurulamadı, LIKE aramasına düşülüyor")
+        search_backend = "like"
+
+    return search_backend
+
+
+def has_allergen(allergy: Optional[str], allergens: list[str]) -> bool:
+    """allergens küçük harf olmalı; MenuStore.allergen_bitmap ile aynı kural"""
+    if not allergy:
+        return False
+    allergy = allergy.lower()
+    return any(a in allergy for a in allergens)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _tokens(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_QUERY_TOKENS]
+
+
+def search_menu_items(
+    db,
+    q: str,
+    exclude_allergens: list[str],
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    """
+    Sıralı sonuçları döner; limit+1 satır çekilir ki has_more bilinsin.
+    Dönüş: (rows, has_more)
+    """
+    tokens = _tokens(q)
+    if not tokens:
+        return [], False
+
+    params = {}
+    where = []
+
+    if search_backend == "fts5":
+        params["q"] = " ".join(f'"{t}"*' for t in tokens)
+        source = (
+            "menuitem_fts JOIN menuitem m ON m.food_id = menuitem_fts.rowid"
+        )
+        where.append("menuitem_fts MATCH :q")
+        rank = "bm25(menuitem_fts, 10.0, 1.0)"
+        order = "rank ASC"
+    elif search_backend == "tsvector":
+        params["q"] = " & ".join(f"{t}:*" for t in tokens)
+        source = "menuitem m"
+        where.append("m.search_tsv @@ to_tsquery('simple', :q)")
+        rank = "ts_rank(m.search_tsv, to_tsquery('simple', :q))"
+        order = "rank DESC"
+    else:
+        source = "menuitem m"
+        for i, t in enumerate(tokens):
+            params[f"t{i}"] = f"%{t}%"
+            where.append(
+                f"(lower(m.name) LIKE :t{i} OR lower(coalesce(m.description, '')) LIKE :t{i})"
+            )
+        rank = "0"
+        order = "m.name ASC"
+
+    # Alerjenler: kaba ön filtre SQL'de. lower() SQLite'ta ASCII dışını
+    # küçültmese de burada elenen her satır Python kuralına göre de
+    # alerjenlidir; "SÜT" gibi kaçanlar aşağıda has_allergen ile elenir.
+    allergens = [a for a in (x.strip().lower() for x in exclude_allergens) if a]
+    for i, allergen in enumerate(allergens):
+        params[f"a{i}"] = "%" + _escape_like(allergen) + "%"
+        where.append(f"(m.allergy IS NULL OR lower(m.allergy) NOT LIKE :a{i} ESCAPE '\\')")
+
+    if min_price is not None:
+        params["min_price"] = min_price
+        where.append("m.price >= :min_price")
+    if max_price is not None:
+        params["max_price"] = max_price
+        where.append("m.price <= :max_price")
+
+    sql = f"""
+        SELECT m.food_id, m.restaurant_id, r.restaurant_name,
+               m.name, m.price, m.allergy, m.description, {rank} AS rank
+        FROM {source}
+        JOIN restaurant r ON r.restaurant_id = m.restaurant_id
+        WHERE {" AND ".join(where)}
+        ORDER BY {order}, m.food_id
+    """
+    if allergens:
+        # Offset Python'da uygulanır; taranan satır sayısı sınırlı
+        sql += "LIMIT :scan"
+        params["scan"] = SEARCH_MAX_SCAN
+    else:
+        sql += "LIMIT :limit OFFSET :offset"
+        params.update(limit=limit + 1, offset=offset)
+
+    stmt = text(sql)
+    for name in ("min_price", "max_price"):
+        if name in params:
+            stmt = stmt.bindparams(bindparam(name, type_=Numeric(6, 2)))
+    stmt = stmt.columns(price=Numeric(6, 2))
+
+    if not allergens:
+        rows = db.execute(stmt, params).all()
+        return rows[:limit], len(rows) > limit
+
+    # Son karar safe_menu.py ile birebir aynı kuralla (str.lower + alt-dize)
+    rows = []
+    skipped = scanned = 0
+    result = db.execute(stmt, params, execution_options={"yield_per": 500})
+    try:
+        for row in result:
+            scanned += 1
+            if has_allergen(row.allergy, allergens):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            rows.append(row)
+            if len(rows) > limit:
+                break
+    finally:
+        result.close()
+    if scanned >= SEARCH_MAX_SCAN and len(rows) <= limit:
+        return rows, True  # tarama sınırı: devamı olabilir
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,194 @@
+# backend/warmup.py
+"""
+/profile sonrası spekülatif ısıtma: kullanıcı onboarding'i bitirip sohbet
+sayfasına gelene kadar ilk /chat'in ihtiyaç duyduğu her şey arka planda
+hazırlanır (profil metni, güvenli menü, menü metni, istenirse varsayılan
+"Ne yesem?" önerisi).
+
+- Kuyruk sınırlı (WARMUP_QUEUE_SIZE); doluysa yeni iş atılır ve sayılır
+- Her kullanıcının bir nesil (generation) numarası var; yeni bir profil
+  yazımı eski işi iptal eder (çalışan iş adımlar arasında is_current ile
+  kontrol eder, kuyruktaki iş en güncel nesille çalışır)
+- Sonuç WarmedChat olarak tutulur; /chat sadece nesil ve katalog sürümü
+  tutuyorsa kullanır, varsayılan öneri tek kullanımlıktır
+"""
+
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_QUEUE_SIZE = int(os.getenv("WARMUP_QUEUE_SIZE", "1000"))
+WARMUP_MAX_USERS = int(os.getenv("WARMUP_MAX_USERS", "10000"))
+WARMUP_TTL_SECONDS = float(os.getenv("WARMUP_TTL_SECONDS", "900"))
+# LLM çağrısı pahalı; varsayılan öneri sadece açıkça istenirse üretilir
+WARMUP_DEFAULT_RECOMMENDATION = os.getenv("WARMUP_DEFAULT_RECOMMENDATION", "0") == "1"
+WARMUP_DEFAULT_MESSAGE = os.getenv("WARMUP_DEFAULT_MESSAGE", "Ne yesem?")
+
+
+def is_default_message(message: str) -> bool:
+    return message.strip().lower().rstrip("?!. ") == WARMUP_DEFAULT_MESSAGE.strip().lower().rstrip("?!. ")
+
+
+class WarmedChat:
+    __slots__ = (
+        "generation", "catalog_version", "diet_text", "preference_text",
+        "menu_text", "prompt", "reply", "created",
+    )
+
+    def __init__(
+        self,
+        generation: int,
+        catalog_version: int,
+        diet_text: str,
+        preference_text: str,
+        menu_text: str,
+    ):
+        self.generation = generation
+        self.catalog_version = catalog_version  # SafeMenuIndex.version
+        self.diet_text = diet_text
+        self.preference_text = preference_text
+        self.menu_text = menu_text
+        self.prompt: Optional[str] = None
+        self.reply: Optional[str] = None
+        self.created = time.monotonic()
+
+
+class Warmup:
+    """
+    task(user_id, generation) -> Optional[WarmedChat]
+    task uzun adımlardan önce is_current(user_id, generation) sormalı.
+    """
+
+    def __init__(self, task: Callable, max_pending: int = WARMUP_QUEUE_SIZE):
+        self._task = task
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # Sadece kuyrukta bekleyen / çalışan kullanıcılar için nesil tutulur
+        self._generation: dict[int, int] = {}
+        self._pending: set[int] = set()
+        self._running: Optional[int] = None
+        self._entries: OrderedDict[int, WarmedChat] = OrderedDict()
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------------------------
+    # Arka plan
+    # -------------------------
+
+    def start(self):
+        if not WARMUP_ENABLED:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                user_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                self._pending.discard(user_id)
+                generation = self._generation.get(user_id)
+                self._running = user_id
+            try:
+                if generation is not None:
+                    entry = self._task(user_id, generation)
+                    if entry is not None:
+                        self._put(user_id, entry)
+            except Exception:
+                # Isıtma sadece hızlandırır; hata olursa /chat normal yoldan çalışır
+                logger.exception("warmup başarısız (user_id=%s)", user_id)
+            finally:
+                with self._lock:
+                    self._running = None
+                    if user_id not in self._pending:
+                        self._generation.pop(user_id, None)
+
+    # -------------------------
+    # Nesil / iptal
+    # -------------------------
+
+    def submit(self, user_id: int) -> bool:
+        """Profil yazımından sonra çağrılır; önceki iş ve sonuç geçersiz olur."""
+        if not WARMUP_ENABLED:
+            return False
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation[user_id] = next(self._ids)
+            if user_id in self._pending:
+                return True  # kuyruktaki iş yeni nesille çalışacak
+            try:
+                self._queue.put_nowait(user_id)
+            except queue.Full:
+                self.dropped += 1
+                if self._running != user_id:
+                    self._generation.pop(user_id, None)
+                return False
+            self._pending.add(user_id)
+            return True
+
+    def cancel(self, user_id: int):
+        """Başka bir worker profili değiştirdi: sonucu at, çalışan işi iptal et."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            if user_id in self._pending or self._running == user_id:
+                self._generation[user_id] = next(self._ids)
+            else:
+                self._generation.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for user_id in self._generation:
+                self._generation[user_id] = next(self._ids)
+
+    def is_current(self, user_id: int, generation: int) -> bool:
+        return self._generation.get(user_id) == generation
+
+    # -------------------------
+    # Sonuçlar
+    # -------------------------
+
+    def _put(self, user_id: int, entry: WarmedChat):
+        with self._lock:
+            if self._generation.get(user_id) != entry.generation:
+                return  # bu arada profil değişti
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > WARMUP_MAX_USERS:
+                self._entries.popitem(last=False)
+
+    def get(self, user_id: int) -> Optional[WarmedChat]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry.created > WARMUP_TTL_SECONDS:
+                del self._entries[user_id]
+                return None
+            return entry
+
+    def take_reply(self, user_id: int, prompt: str) -> Optional[str]:
+        """Hazır öneri sadece birebir aynı prompt için ve bir kez kullanılır."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry.reply is None or entry.prompt != prompt:
+                return None
+            reply, entry.reply, entry.prompt = entry.reply, None, None
+            return reply